@@ -1,8 +1,9 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
-from src.notion2gcalendar import load_credentials, google_calendar_service, read_database, parse_tasks_in_database, read_events, parse_events, synchronize_tasks
+from src.notion2gcalendar import load_credentials, google_calendar_service, read_database, parse_tasks_in_database, read_events, update_events, synchronize_tasks, close_sessions, load_state, save_state
 
 if __name__ == "__main__":
     load_dotenv()
@@ -17,6 +18,8 @@ if __name__ == "__main__":
     GOOGLE_CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID")
     READ_CALENDAR_SINCE=os.getenv("READ_CALENDAR_SINCE")
     SCOPES = [GOOGLE_API_SCOPE]
+    # Events of the previous synchronization are cached to read only modified events
+    SYNC_STATE_FILE = os.getenv("SYNC_STATE_FILE", ".sync_state.json")
 
     # Load Google API credentials
     credentials = load_credentials(GOOGLE_SERVICE_ACCOUNT_SECRET_FILE, SCOPES)
@@ -24,19 +27,26 @@ if __name__ == "__main__":
     # Start google calendar service
     calendar_service = google_calendar_service(credentials)
 
-    # NOTION
-    # Read tasks on Notion
-    database_response = read_database(NOTION_API_KEY, NOTION_DATABASE_ID)
-    # Parse tasks to start synchronization
-    parsed_tasks, err = parse_tasks_in_database(database_response)
-    
-    # Google Calendar
-    # Read events from calendar
-    all_events = read_events(calendar_service, GOOGLE_CALENDAR_ID, since=READ_CALENDAR_SINCE)
-    # Parse events
-    parsed_events, gc_err = parse_events(all_events)
-    
+    # Load state of the previous synchronization
+    state = load_state(SYNC_STATE_FILE, GOOGLE_CALENDAR_ID)
+
+    # Notion and Google Calendar do not depend on each other, read and parse
+    # them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # NOTION
+        # Read and parse tasks to start synchronization
+        fut_db = executor.submit(lambda: parse_tasks_in_database(read_database(NOTION_API_KEY, NOTION_DATABASE_ID)))
+        # Google Calendar
+        # Read events changed since the previous synchronization and parse them
+        fut_ev = executor.submit(lambda: update_events(state, read_events(
+            calendar_service, GOOGLE_CALENDAR_ID, since=READ_CALENDAR_SINCE, sync_state=state)))
+        parsed_tasks, err = fut_db.result()
+        parsed_events, gc_err = fut_ev.result()
+
     # SYNCHRONIZE!
     tasks, errors = synchronize_tasks(parsed_tasks, parsed_events, calendar_service, GOOGLE_CALENDAR_ID)
+    close_sessions()
+    state['events'] = parsed_events
+    save_state(state, SYNC_STATE_FILE)
 
     print('Synchronization has been completed at %s!' %datetime.today().isoformat())
\ No newline at end of file
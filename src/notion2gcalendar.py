@@ -1,8 +1,23 @@
-import requests 
+import json
+import random
+import threading
+import time
+import orjson
+import requests
+import httplib2
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache, partial
+from itertools import chain
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from googleapiclient.model import JsonModel
 
 
 """
@@ -32,6 +47,107 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+# A single pooled session keeps the TLS connection to Notion alive between
+# calls, so repeated queries (pagination, periodic syncs) skip the handshake.
+# Querying a database is read-only, hence POST is safe to retry. Pages depend
+# on the cursor of the previous page, so HTTP/2 multiplexing would not help;
+# compressed responses are requested instead. googleapiclient already asks
+# for gzip ("(gzip)" user agent and Accept-Encoding) on Google Calendar calls.
+_NOTION_SESSION = requests.Session()
+_NOTION_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504],
+                      allowed_methods=None)))
+_NOTION_SESSION.headers.update({"User-Agent": "notion2googlecalendar/0.1",
+                                "Accept-Encoding": "gzip, deflate",
+                                "Connection": "keep-alive"})
+_NOTION_TIMEOUT = (3.05, 30)  # (connect, read) seconds
+_NOTION_PAGE_SIZE = 100  # Maximum allowed by Notion
+# Only these properties are requested, the rest is never read
+_NOTION_PROPERTIES = ('Name', 'Description', 'Notes', 'Category', 'Assignment Date', 'Due Date', 'Status')
+_property_ids_cache = {}  # database ID -> IDs of _NOTION_PROPERTIES
+# Tasks with these statuses are not synchronized, they are filtered out by Notion
+_CLOSED_STATUSES = ('Completed', 'Closed', 'Failed')
+_NOTION_FILTER = {"and": [{"property": "Status", "select": {"does_not_equal": status}}
+                          for status in _CLOSED_STATUSES]}
+_CALENDAR_PAGE_SIZE = 2500  # Maximum allowed by Google Calendar
+
+# Task data is stored in private extended properties of events. Google limits
+# the length of each property value to this many characters.
+_MAX_PROPERTY_LENGTH = 1024
+
+# Calendar calls are bundled into batch requests of at most _BATCH_SIZE calls,
+# and a few batches are dispatched concurrently while synchronizing. Batched
+# calls rejected by rate limits (429, 403 rateLimitExceeded) are retried up to
+# _NUM_RETRIES times with exponential backoff; updates and deletes are also
+# retried on 5xx and transport errors (see _should_retry()). Single calls use
+# googleapiclient's num_retries.
+_BATCH_SIZE = 50
+_SYNC_WORKERS = 2
+_NUM_RETRIES = 3
+_RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+_thread_local = threading.local()
+
+
+def _thread_http(service):
+    """Returns an authorized http object owned by the calling thread.
+
+    httplib2.Http objects are not thread-safe, therefore each worker thread
+    executes its requests through its own connection.
+    """
+    https = getattr(_thread_local, 'https', None)
+    if https is None:
+        https = _thread_local.https = {}
+    credentials = service._http.credentials
+    if id(credentials) not in https:
+        # build_http() sets the socket timeout and redirect codes googleapiclient uses
+        https[id(credentials)] = AuthorizedHttp(credentials, http=build_http())
+
+    return https[id(credentials)]
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel which decodes responses of Google APIs with orjson."""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode('utf-8') if isinstance(content, bytes) else content
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+
+        return body
+
+
+def _prefetch_pages(fetch_page):
+    """Iterates over pages of a paginated API while fetching the next page.
+
+    The first page is requested immediately, before iteration starts. While
+    the caller processes a page, the following one is fetched in background.
+
+    Args:
+        fetch_page: callable which takes a page token (None for the first
+            page) and returns (page, next_page_token). Falsy next_page_token
+            means that the page is the last one.
+
+    Returns:
+        pages: an iterator of pages
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    first = executor.submit(fetch_page, None)
+
+    def pages(future):
+        try:
+            while future is not None:
+                page, token = future.result()
+                future = executor.submit(fetch_page, token) if token else None
+                yield page
+        finally:
+            executor.shutdown(wait=False)
+
+    return pages(first)
+
 
 def load_credentials(secret_file_path, scopes):
     """Loads credentials if secret_file_path is correct.
@@ -57,30 +173,101 @@ def load_credentials(secret_file_path, scopes):
 def google_calendar_service(credentials):
     """Creates service for Google Calendar based on given credentials."""
     try:
-        service = build('calendar', 'v3', credentials=credentials)
+        service = build('calendar', 'v3', credentials=credentials, model=_OrjsonModel())
     except Exception as error:
         raise error
 
     return service
 
-def read_events(service, calendar_id, since='2024-01-01T00:00:00Z'):
-    """Reads and returns all events on the calendar since specified date."""
-    try:
-        response = service.events().list(calendarId=calendar_id, timeMin=since).execute()
-        events = response.get('items', [])
+def read_events(service, calendar_id, since='2024-01-01T00:00:00Z', sync_state=None):
+    """Reads all events on the calendar since specified date.
 
-        return events
-    except Exception as error:
-        print(error)
+    Pages are requested in background, so reading starts as soon as this
+    function is called. Errors are raised while iterating over the events.
+
+    If sync_state (see load_state()) has a sync token, only events changed
+    since the synchronization which stored it are read, including deleted
+    ones which are marked as "cancelled". Otherwise, or if the token has
+    expired, all events are read and cached events of sync_state are dropped.
+    The sync token for the next synchronization is stored in sync_state.
+
+    Returns:
+        events: an iterator of events
+    """
+    sync_token = sync_state.get('sync_token') if sync_state is not None else None
+    if sync_state is not None and sync_token is None:
+        sync_state['events'] = {}
+
+    def fetch_page(page_token):
+        nonlocal sync_token
+        query = {'syncToken': sync_token} if sync_token else {'timeMin': since}
+        try:
+            response = service.events().list(calendarId=calendar_id, singleEvents=True,
+                                              maxResults=_CALENDAR_PAGE_SIZE, pageToken=page_token,
+                                              **query).execute()
+        except HttpError as error:
+            if error.resp.status != 410 or not sync_token or page_token:
+                raise
+            # Sync token has expired, read all events again
+            sync_token = None
+            sync_state['events'] = {}
+
+            return fetch_page(None)
+
+        if sync_state is not None and 'nextSyncToken' in response:
+            sync_state['sync_token'] = response['nextSyncToken']
+
+        return response.get('items', []), response.get('nextPageToken')
+
+    return chain.from_iterable(_prefetch_pages(fetch_page))
 
 def read_database(notion_api_key, database_id):
-    """Reads entries of specified database"""
+    """Reads entries of specified database, except closed tasks
+
+    Pages are requested in background, so reading starts as soon as this
+    function is called. Errors are raised while iterating over the pages.
+
+    Returns:
+        pages: an iterator of decoded query responses
+    """
 
     database_url = f"https://api.notion.com/v1/databases/{database_id}/query"
-    api_headers = {"Authorization": "Bearer " + notion_api_key, "Notion-Version": "2022-06-28"}
-    response = requests.request("POST", database_url, headers=api_headers)
+    api_headers = {"Authorization": "Bearer " + notion_api_key, "Notion-Version": "2022-06-28",
+                   "Content-Type": "application/json"}
+
+    def fetch_page(cursor):
+        property_ids = _property_ids(database_id, api_headers)
+        # IDs are already URL encoded by Notion
+        query_url = database_url + "?" + "&".join("filter_properties=" + x for x in property_ids)
+        body = {"filter": _NOTION_FILTER, "page_size": _NOTION_PAGE_SIZE}
+        if cursor:
+            body["start_cursor"] = cursor
+        response = _NOTION_SESSION.post(query_url, headers=api_headers, data=orjson.dumps(body),
+                                        timeout=_NOTION_TIMEOUT)
+        response.raise_for_status()
+        page = orjson.loads(response.content)
+
+        return page, page['next_cursor'] if page.get('has_more') else None
+
+    return _prefetch_pages(fetch_page)
+
+
+def _property_ids(database_id, api_headers):
+    """Returns IDs of the used properties of the database, cached per database."""
+    if database_id not in _property_ids_cache:
+        response = _NOTION_SESSION.get(f"https://api.notion.com/v1/databases/{database_id}",
+                                       headers=api_headers, timeout=_NOTION_TIMEOUT)
+        response.raise_for_status()
+        properties = orjson.loads(response.content)['properties']
+        _property_ids_cache[database_id] = [properties[name]['id'] for name in _NOTION_PROPERTIES
+                                           if name in properties]
+
+    return _property_ids_cache[database_id]
+
 
-    return response
+def close_sessions():
+    """Closes pooled HTTP connections. Call it once synchronization is done."""
+    _NOTION_SESSION.close()
 
 
 def parse_events(events):
@@ -104,19 +291,25 @@ def parse_events(events):
             tmp['event_id'] = elem['id']  # ID required in deletion and update
             # Parse details of tasks into predefined structure
             tmp['subject'] = elem['summary']
-            # Description includes rest of the data related to a task.
-            # Description is parsed into relevant keys
-            description = elem['description'].strip().split('\n')  # Split description
-            tmp['description'] = description[0].split(":")[1].strip()
-            tmp['notes'] = description[1].split(":")[1].strip()
-            tmp['category'] = description[2].split(":")[1].strip()
-            tmp['assignment_date'] = description[3].split(":")[1].strip()
-            dueDate = elem['end']['dateTime'].split('T')  # Split dueDate to date, time
-            tmp['due_date'] = dueDate[0]  # DueDate of created event
-            tmp['due_hour'] = dueDate[1]  # DueHour of created event
+            # Split dueDate to date, time
+            tmp['due_date'], _, tmp['due_hour'] = elem['end']['dateTime'].partition('T')
+            private = elem.get('extendedProperties', {}).get('private', {})
+            if 'task_id' in private:
+                # Task specific information is stored in extended properties
+                tmp['notes'] = private['notes']
+                tmp['category'] = private['category']
+                tmp['assignment_date'] = private['assignment_date']
+                tmp['last_edited_time'] = private['last_edited_time']
+                tmp['task_id'] = private['task_id']
+                parsed_events[tmp['task_id']] = tmp
+                continue
+            # Events created by former versions include rest of the data
+            # related to a task in description. It is parsed into relevant keys
+            text, last_edited_time, task_id = elem['description'].strip().rsplit('\n', 2)
+            tmp.update(_parse_legacy_description(text))
             # Get task specific database information
-            tmp['last_edited_time'] = description[-2].strip()
-            tmp['task_id'] = description[-1].strip()
+            tmp['last_edited_time'] = last_edited_time.strip()
+            tmp['task_id'] = task_id.strip()
             parsed_events[tmp['task_id']] = tmp
         except Exception as error:
             err.append([elem, error])
@@ -124,6 +317,90 @@ def parse_events(events):
     return parsed_events, err
 
 
+def _parse_legacy_description(text):
+    """Parses description of events written by former versions of task_to_event().
+
+    Description and notes may span multiple lines, so fields are located by
+    their labels: notes start at the first "Notes:" line, category and
+    assignment date at the last "Category:" and "Assignment Date:" lines.
+    Only str.find/rfind scans are used, hence parsing is linear in length of
+    the description, which users may edit freely.
+
+    Args:
+        text: event description without its last two lines, which are last
+            edited time and ID of the task
+
+    Returns:
+        fields: a dictionary of notes, category and assignment_date, the same
+            keys that are read from extended properties of current events
+    """
+    notes_at = text.find('\nNotes:')
+    assignment_at = text.rfind('\nAssignment Date:')
+    category_at = text.rfind('\nCategory:', 0, assignment_at)
+    if not text.startswith('Description:') or not -1 < notes_at < category_at < assignment_at:
+        raise ValueError("Unrecognized event description")
+
+    return {'notes': text[notes_at + len('\nNotes:'):category_at].strip(),
+            'category': text[category_at + len('\nCategory:'):assignment_at].strip(),
+            'assignment_date': text[assignment_at + len('\nAssignment Date:'):].partition('\n')[0].strip()}
+
+
+def update_events(sync_state, events):
+    """Applies events read with read_events(sync_state=...) to cached events.
+
+    Args:
+        sync_state: state of the previous synchronization, see load_state()
+        events: events changed since the previous synchronization
+
+    Returns:
+        parsed_events: a dictionary of structured events. Key is task ID.
+        err: a list of could not structured events with Exception info
+    """
+    cancelled, modified = set(), []
+    for elem in events:
+        if elem.get('status') == 'cancelled':
+            cancelled.add(elem['id'])
+        else:
+            modified.append(elem)
+    parsed_events, err = parse_events(modified)
+    # Modified events overwrite cached ones, deleted events are dropped. Cached
+    # events are read after all events, since read_events() may drop them.
+    for task_id, event in sync_state['events'].items():
+        if task_id not in parsed_events and event['event_id'] not in cancelled:
+            parsed_events[task_id] = event
+
+    return parsed_events, err
+
+
+def load_state(path, calendar_id):
+    """Loads the state saved by save_state() after the previous synchronization.
+
+    State is discarded if it is missing, corrupted or belongs to another calendar.
+
+    Args:
+        path: path to json state file
+        calendar_id: Calendar ID of Google Calendar
+
+    Returns:
+        state: a dictionary with Google Calendar "sync_token" and parsed "events"
+    """
+    try:
+        with open(path) as state_file:
+            state = json.load(state_file)
+        if state.get('calendar_id') == calendar_id:
+            return state
+    except (FileNotFoundError, ValueError):
+        pass
+
+    return {'calendar_id': calendar_id, 'sync_token': None, 'events': {}}
+
+
+def save_state(state, path):
+    """Saves state of the synchronization to be loaded with load_state()."""
+    with open(path, 'w') as state_file:
+        json.dump(state, state_file)
+
+
 def task_to_event(task):
     """Converts task to required event structure of Google Calendar
 
@@ -144,17 +421,23 @@ def task_to_event(task):
     
     event_finish = event_start + timedelta(minutes=30)  # Finish datetime
 
-    description = 'Description: ' + task['description'] + '\n' \
-        + 'Notes: ' + task['notes'] + '\n' \
-        + "Category: " + task['category'] + '\n' \
-        + "Assignment Date: " + task['assignment_date'] +  ' - ' + task['assignment_hour'] + '\n' \
-        + '----------' + '\n' \
-        + 'Please do not edit following lines!' + '\n' \
-        + task['last_edited_time'] + '\n' \
-        + task['task_id'] + '\n'
-    
+    assignment_date = task['assignment_date'] + ' - ' + task['assignment_hour']
+    description = '\n'.join(('Description: ' + task['description'],
+                              'Notes: ' + task['notes'],
+                              'Category: ' + task['category'],
+                              'Assignment Date: ' + assignment_date,
+                              ''))
+    # Task data required for synchronization is kept out of the description,
+    # it can be read back without parsing
+    private = {'task_id': task['task_id'],
+               'last_edited_time': task['last_edited_time'],
+               'category': task['category'][:_MAX_PROPERTY_LENGTH],
+               'notes': task['notes'][:_MAX_PROPERTY_LENGTH],
+               'assignment_date': assignment_date}
+
     event = {'summary': task['name'],
              'description': description,
+             'extendedProperties': {'private': private},
              'start': {'dateTime': event_start.astimezone().isoformat()},
              'end': {'dateTime': event_finish.astimezone().isoformat()},
              'reminders': {
@@ -179,107 +462,122 @@ def str_to_date(date, hour, user_time_zone):
     Args:
         date: YYYY-MM-DD,  Y=Year, M=Month, D=Day, formatted date string
         hour: HH:MM:SS, H=Hour, M=Minute, S=Seconds, formatted hour string
+        user_time_zone: [+-]HH:MM, UTC offset of the user. Sign defaults to +
 
     Returns:
         date_time_obj: a datetime.datetime object
     """
-    due_date = [int(x) for x in date.split('-')]
-    due_hour = [int(x) for x in hour.split(':')]
-    user_time_zone_hours, user_time_zone_minutes = user_time_zone.split(":")
-    user_time_zone = timezone((timedelta(hours=int(
-        user_time_zone_hours)) + timedelta(minutes=int(user_time_zone_minutes))))
-    # Year, month, day, hour, minute, seconds
-    date_time_obj = datetime(due_date[0], due_date[1], due_date[2],
-                             due_hour[0], due_hour[1], due_hour[2],
-                             tzinfo=user_time_zone)
+    date_time_obj = datetime.fromisoformat(f"{date}T{hour}").replace(tzinfo=_timezone(user_time_zone))
 
     return date_time_obj
 
-def parse_tasks_in_database(db_response):
-    results = db_response.json()['results']
+
+@lru_cache(maxsize=64)
+def _timezone(offset):
+    """Returns the timezone of [+-]HH:MM formatted offset, reusing created ones."""
+    hours, minutes = offset.lstrip('+-').split(':')
+    delta = timedelta(hours=int(hours), minutes=int(minutes))
+
+    return timezone(-delta if offset.startswith('-') else delta)
+
+def parse_tasks_in_database(database_pages):
+    """Parses tasks in pages returned from read_database() func.
+
+    Args:
+        database_pages: an iterable of decoded database query responses
+
+    Returns:
+        parsed_tasks: a dictionary of structured tasks. Key is task ID.
+        err: a list of could not structured tasks with Exception info
+    """
+    results = chain.from_iterable(page['results'] for page in database_pages)
     parsed_tasks = {}
     err = []
     # properties = ['Name', 'Description', 'Notes', 'Category', 'Assignment Date', 'Due Date']
     for elem in results:
-        # check whether status is specified or not. If not specified print it and move to next package
-        try:
-            package_status = elem['properties']['Status']['select']['name']
-        except Exception as error:
-            print(error)
+        # check whether status is specified or not. If not specified print it and move to next package.
+        # Closed tasks are already filtered out by read_database()
+        if not (elem['properties'].get('Status') or {}).get('select'):
+            print("Status is not specified!")
             print("Missconfigured Task: ", elem['url'])
             continue
 
-        if package_status not in ['Completed', 'Closed', 'Failed']:
-            try:
-                tmp = {}
-                # Get unique DB ID record in Notion
-                tmp['task_id'] = elem['id']
-
-                if elem['properties']['Name']['title']:
-                    # Get title of the task
-                    tmp['name'] = elem['properties']['Name']['title'][0]['plain_text']
-                else:
-                    tmp['name'] = "Title is not specified!"
-
-                if elem['properties']['Description']['rich_text']:
-                    #  Get description of the task
-                    tmp['description'] = elem['properties']['Description']['rich_text'][0]['plain_text']
+        try:
+            properties = elem['properties']
+            # Values are collected first, so that the task is built at once
+            assignment_hour = user_time_zone = ""
+
+            if properties['Name']['title']:
+                # Get title of the task
+                name = properties['Name']['title'][0]['plain_text']
+            else:
+                name = "Title is not specified!"
+
+            if properties['Description']['rich_text']:
+                #  Get description of the task
+                description = properties['Description']['rich_text'][0]['plain_text']
+            else:
+                description = "Description is empty!"
+
+            if properties['Notes']['rich_text']:
+                # Get notes if any
+                notes = properties['Notes']['rich_text'][0]['plain_text']
+            else:
+                notes = "Notes are empty!"
+
+            if len(properties['Category']['multi_select']) != 0:
+                category = ", ".join([a['name'] for a in properties['Category']['multi_select']])
+            else:
+                category = ["Not categorized!"]
+
+            if properties['Assignment Date']['date']['start'] != type(None):
+                assignment_date = properties['Assignment Date']['date']['start'].split('T')
+                if len(assignment_date) == 2:
+                    assignment_hour = assignment_date[1].split('.')[0] # HH:MM:SS
+                    user_time_zone = assignment_date[1].split('+')[1] #  HH:MM
                 else:
-                    tmp['description'] = "Description is empty!"
-
-                if elem['properties']['Notes']['rich_text']:
-                    # Get notes if any
-                    tmp["notes"] = elem['properties']['Notes']['rich_text'][0]['plain_text']
+                    assignment_hour = "00:00"
+                assignment_date = assignment_date[0] # YYYY-MM-DD
+            else:
+                assignment_date = "Assignment date is missing!"
+
+            if type(properties['Due Date']['date']['start']) != type(None):
+                due_date = properties['Due Date']['date']['start'].split('T')
+                if len(due_date) == 2:
+                    due_hour = due_date[1].split('.')[0] # HH:MM:SS
+                    user_time_zone = due_date[1].split('+')[1] #  HH:MM
                 else:
-                    tmp['notes'] = "Notes are empty!"
+                    due_hour = "12:00:00"
+                    if user_time_zone == "":
+                        user_time_zone = "00:00"
+                due_date = due_date[0] # YYYY-MM-DD
+
+            else:  # dueHour has no effect on time even if it is specified
+                assignment_date = "DUE DATE IS NOT SPECIFIED. TASK IS CREATED ON CREATION TIME!"
+                due_date = elem['created_time'].split('T')[0]
+                due_hour = elem['created_time'].split('T')[1].split('.')[0]
+
+            # Unique DB ID record in Notion is the key of the task
+            parsed_tasks[elem['id']] = {'task_id': elem['id'],
+                                        'name': name,
+                                        'description': description,
+                                        'notes': notes,
+                                        'category': category,
+                                        'assignment_date': assignment_date,
+                                        'assignment_hour': assignment_hour,
+                                        'user_time_zone': user_time_zone,
+                                        'due_date': due_date,
+                                        'due_hour': due_hour,
+                                        'last_edited_time': elem['last_edited_time']}
 
-                if len(elem['properties']['Category']['multi_select']) != 0:
-                    tmp['category'] = ", ".join(
-                        [a['name'] for a in elem['properties']['Category']['multi_select']])
-                else:
-                    tmp['category'] = ["Not categorized!"]
-
-                if elem['properties']['Assignment Date']['date']['start'] != type(None):
-                    assignment_date = elem['properties']['Assignment Date']['date']['start'].split('T')
-                    if len(assignment_date) == 2:
-                        tmp['assignment_date'] = assignment_date[0] # YYYY-MM-DD
-                        tmp['assignment_hour'] = assignment_date[1].split('.')[0] # HH:MM:SS
-                        tmp['user_time_zone'] = assignment_date[1].split('+')[1] #  HH:MM
-                    else:
-                        tmp['assignment_date'] = assignment_date[0] # YYYY-MM-DD
-                        tmp['assignment_hour'] = "00:00"
-                        tmp['user_time_zone'] = ""
-                else:
-                    tmp['assignment_date'] = "Assignment date is missing!"
-
-                if type(elem['properties']['Due Date']['date']['start']) != type(None):
-                    due_date = elem['properties']['Due Date']['date']['start'].split('T')
-                    if len(due_date) == 2:
-                        tmp['due_date'] = due_date[0] # YYYY-MM-DD
-                        tmp['due_hour'] = due_date[1].split('.')[0] # HH:MM:SS
-                        tmp['user_time_zone'] = due_date[1].split('+')[1] #  HH:MM
-                    else:
-                        tmp['due_date'] = due_date[0] # YYYY-MM-DD
-                        tmp['due_hour'] = "12:00:00"
-                        if tmp['user_time_zone'] == "":
-                            tmp['user_time_zone'] = "00:00"
-
-                else:  # dueHour has no effect on time even if it is specified
-                    tmp['assignment_date'] = "DUE DATE IS NOT SPECIFIED. TASK IS CREATED ON CREATION TIME!"
-                    tmp['due_date'] = elem['created_time'].split('T')[0]
-                    tmp['due_hour'] = elem['created_time'].split('T')[1].split('.')[0]
-
-                tmp['last_edited_time'] = elem['last_edited_time']
-                parsed_tasks[tmp['task_id']] = tmp
-
-            except Exception as error:
-                print(elem['url'], error)
-                err.append([elem, error])
+        except Exception as error:
+            print(elem['url'], error)
+            err.append([elem, error])
 
     return parsed_tasks, err
 
 
-def to_create(task, service, calendar_id):
+def to_create(task, service, calendar_id, http=None):
     """Creates an event for task via service on specifiedcalendar_id
 
     Google API enables configuration of events via a service built with
@@ -292,22 +590,32 @@ def to_create(task, service, calendar_id):
         task: One of the elements of parsed tasks
         service: Google API service built with Calendar scope
         calendar_id: Calendar ID of Google Calendar
+        http: http object to execute the request with, defaults to service's
 
     Returns:
         str(e): If an error occurs during the process, it will be returned.
 
     ToDo: Return a value for success insted of printing
     """
-    task = task
-    event = task_to_event(task)
     try:
-        response = service.events().insert(calendarId=calendar_id, body=event).execute()
-        print('Event %s created at: %s' % (event['summary'], response.get('htmlLink')))
+        response = _create_request(task, service, calendar_id).execute(http=http, num_retries=_NUM_RETRIES)
+        _report_created(response)
     except Exception as error:
         return str(error)
 
 
-def to_delete(parsed_event, service, calendar_id):
+def _create_request(task, service, calendar_id):
+    """Builds, without executing, the insert request of to_create()."""
+    event = task_to_event(task)
+
+    return service.events().insert(calendarId=calendar_id, body=event)
+
+
+def _report_created(response):
+    print('Event %s created at: %s' % (response['summary'], response.get('htmlLink')))
+
+
+def to_delete(parsed_event, service, calendar_id, http=None):
     """Deletes given parsed_event from calendar using previously built service.
 
     Google API enables configuration of events via a service built with
@@ -320,22 +628,30 @@ def to_delete(parsed_event, service, calendar_id):
         parsed_event: One of the elements of parsed_events
         service: Google API service built with Calendar scope
         calendar_id: Calendar ID of Google Calendar
+        http: http object to execute the request with, defaults to service's
 
     Returns:
         str(e): If an error occurs during the process, it will be returned.
 
     ToDo: Return a value for success insted of printing
     """
-    event_id = parsed_event['event_id']
-    subject = parsed_event['subject']
     try:
-        service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
-        print('task: {} has been deleted'.format(subject))
+        _delete_request(parsed_event, service, calendar_id).execute(http=http, num_retries=_NUM_RETRIES)
+        _report_deleted(parsed_event)
     except Exception as error:
         return str(error)
 
 
-def may_update(task, parsed_event, service, calendar_id):
+def _delete_request(parsed_event, service, calendar_id):
+    """Builds, without executing, the delete request of to_delete()."""
+    return service.events().delete(calendarId=calendar_id, eventId=parsed_event['event_id'])
+
+
+def _report_deleted(parsed_event, response=None):
+    print('task: {} has been deleted'.format(parsed_event['subject']))
+
+
+def may_update(task, parsed_event, service, calendar_id, http=None):
     """Updates task on calendar if there is an update.
 
     Google API enables configuration of events via a service built with
@@ -349,6 +665,7 @@ def may_update(task, parsed_event, service, calendar_id):
         parsed_event: One of the elements of parsed_events
         service: Google API service built with Calendar scope
         calendar_id: Calendar ID of Google Calendar
+        http: http object to execute the request with, defaults to service's
 
     Returns:
         str(e): If an error occurs during the process, it will be returned.
@@ -356,15 +673,110 @@ def may_update(task, parsed_event, service, calendar_id):
     ToDo: Return a value for success insted of printing
     """
     if task['last_edited_time'] != parsed_event['last_edited_time']:
-        tmp = task_to_event(task)
-        event_id = parsed_event['event_id']
+        request = _update_request(task, parsed_event, service, calendar_id)
         try:
-            updated_event = service.events().update(calendarId=calendar_id, eventId=event_id, body=tmp).execute()
-            print('Event %s has been updated' % updated_event['summary'])
+            updated_event = request.execute(http=http, num_retries=_NUM_RETRIES)
+            _report_updated(updated_event)
         except Exception as error:
             return str(error)
 
 
+def _update_request(task, parsed_event, service, calendar_id):
+    """Builds, without executing, the update request of may_update()."""
+    tmp = task_to_event(task)
+    event_id = parsed_event['event_id']
+
+    return service.events().update(calendarId=calendar_id, eventId=event_id, body=tmp)
+
+
+def _report_updated(response):
+    print('Event %s has been updated' % response['summary'])
+
+
+def _should_retry(error, idempotent):
+    """Decides whether a failed Google API call is worth retrying.
+
+    Rate limit errors (429, or 403 with a rate limit reason) mean that the
+    request has been rejected, so it is always retried. After transport and
+    5xx errors the request may have been applied anyway, hence only
+    idempotent requests (update, delete) are retried; replaying an insert
+    would create a duplicate event.
+    """
+    if isinstance(error, HttpError):
+        status = int(error.resp.status)
+        if status == 429:
+            return True
+        if status == 403:
+            try:
+                errors = orjson.loads(error.content)['error'].get('errors', [])
+                return any(detail.get('reason') in _RATE_LIMIT_REASONS for detail in errors)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                return False
+        return idempotent and status >= 500
+
+    return idempotent and isinstance(error, (OSError, httplib2.HttpLib2Error))
+
+
+def _execute_batch(operations, service):
+    """Executes (request, on_success) pairs as a single batch HTTP request.
+
+    Requests failing with a temporary error (see _should_retry()) are sent
+    again in a new batch after an exponential backoff, at most _NUM_RETRIES
+    times. If the batch request itself fails, requests which have not been
+    answered yet are retried the same way. A retried delete answered with
+    404 or 410 has been applied by a previous attempt, so it succeeds.
+
+    Args:
+        operations: list of (HttpRequest, callable) pairs. The callable is
+            called with the response of its request if it succeeds.
+        service: Google API service built with Calendar scope
+
+    Returns:
+        err: str(e) of each failed request or None, in order of operations.
+    """
+    err = [None] * len(operations)
+    answered, retry = set(), []
+
+    def callback(request_id, response, exception):
+        index = int(request_id)
+        answered.add(index)
+        request, on_success = operations[index]
+        if (exception is not None and retry_num and request.method == 'DELETE'
+                and isinstance(exception, HttpError) and int(exception.resp.status) in (404, 410)):
+            exception = None
+        if exception is not None:
+            err[index] = str(exception)
+            if _should_retry(exception, request.method != 'POST'):
+                retry.append(index)
+        else:
+            err[index] = None
+            on_success(response)
+
+    pending = list(range(len(operations)))
+    for retry_num in range(_NUM_RETRIES + 1):
+        if retry_num:
+            # Same backoff as googleapiclient's num_retries
+            time.sleep(random.random() * 2 ** retry_num)
+        answered.clear()
+        retry = []
+        batch = service.new_batch_http_request(callback=callback)
+        for index in pending:
+            batch.add(operations[index][0], request_id=str(index))
+        try:
+            batch.execute(http=_thread_http(service))
+        except Exception as error:
+            for index in pending:
+                if index not in answered:
+                    err[index] = str(error)
+                    if _should_retry(error, operations[index][0].method != 'POST'):
+                        retry.append(index)
+        pending = retry
+        if not pending:
+            break
+
+    return err
+
+
 def synchronize_tasks(parsed_tasks, parsed_events, service, calendar_id):
     """Synchronizes Notion tasks with Google Calendar events
 
@@ -384,29 +796,48 @@ def synchronize_tasks(parsed_tasks, parsed_events, service, calendar_id):
         task_ids: classified task_ids as create, delete or update
         err: Faced errors during creation, deletion or update
     """
-    tasks_on_notion = set(parsed_tasks.keys())
-    tasks_on_calendar = set(parsed_events.keys())
-    # Decide which packages to create, to delete and may update
-    to_create_set = tasks_on_notion.difference(tasks_on_calendar)
-    to_delete_set = tasks_on_calendar.difference(tasks_on_notion)
-    may_update_set = tasks_on_calendar.intersection(tasks_on_notion)
-    to_create_err, to_delete_err, may_update_err = [], [], []
-
-    # Iterate over each task
-    for task_id in to_create_set:
-        err = to_create(parsed_tasks[task_id], service, calendar_id)
-        to_create_err.append(err)
-
-    for task_id in to_delete_set:
-        err = to_delete(parsed_events[task_id], service, calendar_id)
-        to_delete_err.append(err)
-
-    for task_id in may_update_set:
-        task, event = parsed_tasks[task_id], parsed_events[task_id]
-        err = may_update(task, event, service, calendar_id)
-        may_update_err.append(err)
-
-    task_ids = [to_create_set, to_delete_set, may_update_set]
+    # Decide which packages to create, to delete and may update, and build
+    # requests of their API calls. Unchanged tasks do not need a request.
+    to_create_ids, to_delete_ids, may_update_ids = [], [], []
+    create_ops, delete_ops, update_ops = [], [], []
+    # Events are classified in a single pass, each is deleted or may be updated
+    for task_id, event in parsed_events.items():
+        task = parsed_tasks.get(task_id)
+        if task is None:
+            to_delete_ids.append(task_id)
+            delete_ops.append((_delete_request(event, service, calendar_id), partial(_report_deleted, event)))
+        else:
+            may_update_ids.append(task_id)
+            if task['last_edited_time'] != event['last_edited_time']:
+                update_ops.append((_update_request(task, event, service, calendar_id), _report_updated))
+            else:
+                update_ops.append((None, None))
+    # Remaining tasks are not on the calendar yet
+    for task_id, task in parsed_tasks.items():
+        if task_id not in parsed_events:
+            to_create_ids.append(task_id)
+            create_ops.append((_create_request(task, service, calendar_id), _report_created))
+    operations = create_ops + delete_ops + update_ops
+    pending = [index for index, (request, _) in enumerate(operations) if request is not None]
+    chunks = [pending[k:k + _BATCH_SIZE] for k in range(0, len(pending), _BATCH_SIZE)]
+
+    def run(chunk):
+        return _execute_batch([operations[index] for index in chunk], service)
+
+    # Execute batches concurrently, results are in operation order:
+    # creations, deletions, then updates
+    results = [None] * len(operations)
+    with ThreadPoolExecutor(max_workers=_SYNC_WORKERS) as executor:
+        for chunk, err in zip(chunks, executor.map(run, chunks)):
+            for index, error in zip(chunk, err):
+                results[index] = error
+
+    n_create, n_delete = len(create_ops), len(delete_ops)
+    to_create_err = results[:n_create]
+    to_delete_err = results[n_create:n_create + n_delete]
+    may_update_err = results[n_create + n_delete:]
+
+    task_ids = [to_create_ids, to_delete_ids, may_update_ids]
     error = [to_create_err, to_delete_err, may_update_err]
 
     return [task_ids, error]